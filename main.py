@@ -4,10 +4,230 @@ PDF Outline Extractor - Main Entry Point
 
 """
 
+import functools
+import gc
 import json
+import logging
+import multiprocessing
+import os
+import signal
 import sys
-from pathlib import Path
-from utils import extract_outline
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+
+log = logging.getLogger("outline")
+
+# Output is compact by default (it is machine-read); PRETTY=1 indents it
+PRETTY = os.environ.get("PRETTY") == "1"
+
+try:
+    import orjson
+
+    _ORJSON_OPTION = orjson.OPT_INDENT_2 if PRETTY else 0
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=_ORJSON_OPTION)
+
+    _dumps_compact = orjson.dumps
+except ImportError:
+    # Built once: json.dumps() constructs a new encoder on every call
+    # whenever non-default options such as indent are passed
+    _encode = json.JSONEncoder(indent=2 if PRETTY else None,
+                               separators=(',', ': ') if PRETTY else (',', ':'),
+                               ensure_ascii=False).encode
+
+    def _dumps(obj) -> bytes:
+        return _encode(obj).encode('utf-8')
+
+    _encode_compact = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+    def _dumps_compact(obj) -> bytes:
+        return _encode_compact(obj).encode('utf-8')
+
+# NDJSON_OUT=1 appends every result as one line of <output>/all.ndjson
+# instead of writing one JSON file per PDF
+NDJSON_OUT = os.environ.get("NDJSON_OUT") == "1"
+NDJSON_FILENAME = "all.ndjson"
+
+# Per-file processing time limit in seconds (0 disables it)
+PER_FILE_TIMEOUT_S = float(os.environ.get("PER_FILE_TIMEOUT_S", 10))
+
+# Shape of the result written for a PDF that could not be processed;
+# copied and filled in per failure
+_ERR_SKELETON = {"title": "", "outline": [], "error": ""}
+
+
+def _error_result(pdf_name: str, error: BaseException) -> Dict[str, Any]:
+    """Build the error result for a PDF that could not be processed."""
+    err = _ERR_SKELETON.copy()
+    err["title"] = f"Error processing {pdf_name}"
+    err["error"] = str(error)
+    return err
+
+
+# Output files are opened relative to a descriptor of the output directory
+# where the platform supports it (not on Windows)
+_USE_DIR_FD = hasattr(os, "O_DIRECTORY") and os.open in os.supports_dir_fd
+_OUTPUT_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _init_worker(log_queue, level: int) -> None:
+    """
+    Worker process initializer: forward log records to the parent's
+    listener so workers do not contend for stdout.
+    """
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+
+class _Deadline(BaseException):
+    """
+    Raised by SIGALRM when a PDF exceeds PER_FILE_TIMEOUT_S. Derives from
+    BaseException so the `except Exception` handlers in utils cannot
+    swallow it and carry on parsing (utils has no bare `except:`).
+    """
+
+
+def _on_deadline(signum, frame):
+    raise _Deadline
+
+
+def _process_one(pdf_file: str) -> Dict[str, Any]:
+    """
+    Extract the outline of a single PDF. Runs inside a worker process; the
+    result is written by the parent's writer threads so the worker can start
+    on the next PDF straight away.
+    """
+    # Imported here rather than at module level: the PDF parsing stack is
+    # slow to import and is not needed when there is nothing to process
+    from utils import extract_outline
+    
+    log.info("Processing: %s", os.path.basename(pdf_file))
+    
+    # Bound the time spent on one PDF so a pathological file cannot stall
+    # the batch; the worker stays usable for the next file
+    timed = PER_FILE_TIMEOUT_S > 0 and hasattr(signal, "setitimer")
+    if timed:
+        signal.signal(signal.SIGALRM, _on_deadline)
+    
+    # Keep the cyclic GC from repeatedly scanning the parser's object graph
+    # mid-parse. Everything allocated meanwhile stays in the young generation,
+    # so collecting that generation afterwards reclaims any cycles the file
+    # left behind.
+    gc.disable()
+    fd = None
+    try:
+        # Have the kernel start reading the whole PDF into the page cache
+        # now, and drop it again once parsed so a long batch does not push
+        # useful pages out of the cache
+        if hasattr(os, "posix_fadvise"):
+            fd = os.open(pdf_file, os.O_RDONLY)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        
+        # The alarm can still fire after extract_outline returns and before
+        # it is disarmed, so arming and disarming are both inside the
+        # _Deadline handler
+        try:
+            if timed:
+                signal.setitimer(signal.ITIMER_REAL, PER_FILE_TIMEOUT_S)
+            return extract_outline(pdf_file)
+        finally:
+            if timed:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except _Deadline:
+        raise TimeoutError(
+            f"PDF processing exceeded {PER_FILE_TIMEOUT_S:g} second limit") from None
+    finally:
+        gc.enable()
+        gc.collect(0)
+        if fd is not None:
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+def _process_isolated(pdf_file: str, pool_options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run _process_one for a single PDF in a worker process of its own, so
+    that if the worker dies no other file is affected.
+    """
+    with ProcessPoolExecutor(max_workers=1, **pool_options) as executor:
+        return executor.submit(_process_one, pdf_file).result()
+
+
+def _result_of(future, pdf_file: str, file_errors: Tuple[type, ...]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Output stem and result of a finished PDF: its outline, or an error
+    result (logged here) if it failed with one of file_errors.
+    """
+    pdf_name = os.path.basename(pdf_file)
+    stem = os.path.splitext(pdf_name)[0]
+    try:
+        result = future.result()
+        
+    except file_errors as e:
+        log.error("✗ Error processing %s: %s", pdf_name, e,
+                  exc_info=log.isEnabledFor(logging.DEBUG))
+        # Write error output
+        result = _error_result(pdf_name, e)
+    
+    return stem, result
+
+
+def _emit_json(out_dir: str, stem: str, obj: Dict[str, Any],
+               dir_fd: Optional[int] = None) -> None:
+    """
+    Write obj to <out_dir>/<stem>.json (UTF-8) in a single write.
+    Used for both outlines and error results; runs on a writer thread,
+    write() releases the GIL. When dir_fd (an open descriptor of out_dir)
+    is given, the file is created relative to it instead of re-resolving
+    out_dir for every file.
+    """
+    output_filename = f"{stem}.json"
+    path = output_filename if dir_fd is not None else os.path.join(out_dir, output_filename)
+    fd = os.open(path, _OUTPUT_FLAGS, 0o644, dir_fd=dir_fd)
+    with open(fd, 'wb') as f:
+        f.write(_dumps(obj))
+    
+    if "error" in obj:
+        log.info("Saved error result to: %s", output_filename)
+    else:
+        log.info("✓ Saved outline to: %s", output_filename)
+
+
+def _append_ndjson(stream, stem: str, obj: Dict[str, Any]) -> None:
+    """
+    Append obj as one {"file": stem, ...} line to the NDJSON output stream.
+    Only called from the single NDJSON writer thread.
+    """
+    stream.write(_dumps_compact({"file": stem, **obj}) + b"\n")
+    
+    if "error" in obj:
+        log.info("Added error result of %s to: %s", stem, NDJSON_FILENAME)
+    else:
+        log.info("✓ Added outline of %s to: %s", stem, NDJSON_FILENAME)
+
+
+def _is_up_to_date(pdf_entry: os.DirEntry, output_dir: str) -> bool:
+    """
+    Check whether the PDF's output JSON exists, is at least as new as the
+    PDF, and is an outline rather than an error result (failures are always
+    retried).
+    """
+    stem = os.path.splitext(pdf_entry.name)[0]
+    output_path = os.path.join(output_dir, f"{stem}.json")
+    try:
+        if os.stat(output_path).st_mtime < pdf_entry.stat().st_mtime:
+            return False
+        with open(output_path, 'rb') as f:
+            return "error" not in json.load(f)
+    except (OSError, ValueError):
+        # Missing, unreadable or not valid JSON: regenerate it
+        return False
 
 
 def main():
@@ -15,54 +235,150 @@ def main():
     Main entry point for PDF outline extraction.
     Processes all PDF files in /app/input and writes JSON output to /app/output.
     """
+    logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO").upper(),
+                        format="%(message)s", stream=sys.stdout)
+    
     # Define input and output directories (works both in Docker and locally)
-    input_dir = Path("/app/input") if Path("/app/input").exists() else Path("input")
-    output_dir = Path("/app/output") if Path("/app/output").exists() else Path("output")
+    input_dir = "/app/input" if os.path.isdir("/app/input") else "input"
+    output_dir = "/app/output" if os.path.isdir("/app/output") else "output"
     
     # Ensure output directory exists
-    output_dir.mkdir(parents=True, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Get all PDF files (any case of the .pdf suffix) from input directory
+    try:
+        pdf_entries = [
+            entry for entry in os.scandir(input_dir)
+            if entry.is_file() and entry.name.lower().endswith('.pdf')
+        ]
+    except FileNotFoundError:
+        pdf_entries = []
+    
+    if not pdf_entries:
+        log.info("No PDF files found in input directory.")
+        return
+    
+    # SKIP_UP_TO_DATE=1 skips PDFs whose outline is already newer than the
+    # PDF, make-style. NDJSON output is rewritten as a whole on every run,
+    # so it always needs every PDF.
+    if not NDJSON_OUT and os.environ.get("SKIP_UP_TO_DATE") == "1":
+        stale_entries = [entry for entry in pdf_entries
+                         if not _is_up_to_date(entry, output_dir)]
+        if len(stale_entries) < len(pdf_entries):
+            log.info("Skipping %d PDF file(s) with up-to-date outlines.",
+                     len(pdf_entries) - len(stale_entries))
+        pdf_entries = stale_entries
     
-    # Get all PDF files from input directory
-    pdf_files = list(input_dir.glob("*.pdf"))
+    # Largest files first (longest-processing-time scheduling): file size is
+    # a cheap proxy for parse time, and starting the slowest files early
+    # keeps one big PDF from finishing alone at the end of the batch
+    pdf_entries.sort(key=lambda entry: entry.stat().st_size, reverse=True)
+    pdf_files = [entry.path for entry in pdf_entries]
     
     if not pdf_files:
-        print("No PDF files found in input directory.")
+        log.info("All outlines are up to date.")
         return
     
-    print(f"Found {len(pdf_files)} PDF file(s) to process.")
+    log.info("Found %d PDF file(s) to process.", len(pdf_files))
     
-    # Process each PDF file
-    for pdf_file in pdf_files:
-        try:
-            print(f"Processing: {pdf_file.name}")
-            
-            # Extract outline from PDF
-            result = extract_outline(pdf_file)
-            
-            # Create output filename
-            output_filename = f"{pdf_file.stem}.json"
-            output_path = output_dir / output_filename
-            
-            # Write JSON output with UTF-8 encoding
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            
-            print(f"✓ Saved outline to: {output_filename}")
+    # Process PDF files in parallel, one worker process per core unless
+    # WORKERS overrides it (e.g. containers pinned to fewer CPUs)
+    workers = int(os.environ.get("WORKERS", 0)) or os.cpu_count() or 1
+    
+    # On Linux, workers are forked from this process after it has imported
+    # the parser stack, so they share the already imported modules instead
+    # of each importing them again
+    from utils import process_context
+    mp_context = process_context()
+    
+    # Failures that are reported per file: PDF parser errors (pdfminer's
+    # exceptions all derive from PSException), I/O errors and timeouts,
+    # invalid input, and a worker process dying on the retry below. Anything
+    # else is a bug and is left to propagate.
+    from pdfminer.psparser import PSException
+    file_errors = (PSException, OSError, ValueError, BrokenProcessPool)
+    
+    # Choose the output sink: one shared NDJSON file fed by a single writer
+    # thread, or one file per PDF created relative to a descriptor of the
+    # output directory, with writes spread over a small thread pool
+    ndjson_stream = None
+    dir_fd = None
+    if NDJSON_OUT:
+        ndjson_stream = open(os.path.join(output_dir, NDJSON_FILENAME), 'wb', buffering=1 << 20)
+        emit = functools.partial(_append_ndjson, ndjson_stream)
+        io_workers = 1
+    else:
+        if _USE_DIR_FD:
+            dir_fd = os.open(output_dir, os.O_RDONLY | os.O_DIRECTORY)
+        emit = functools.partial(_emit_json, output_dir, dir_fd=dir_fd)
+        io_workers = 4
+    
+    # Files retried after a worker died run in spawned processes: they are
+    # started while the writer and log listener threads are busy, and a
+    # child forked while one of them holds a lock (e.g. stdout's) would
+    # deadlock on it
+    retry_context = multiprocessing.get_context("spawn")
+    
+    # Worker log records are funnelled through a queue to a single listener.
+    # The queue is made for spawning, since a queue made for forking cannot
+    # be passed to a spawned worker, while forked workers inherit either.
+    log_queue = retry_context.Queue()
+    listener = QueueListener(log_queue, *logging.getLogger().handlers)
+    listener.start()
+    
+    pool_options = dict(mp_context=mp_context,
+                        initializer=_init_worker,
+                        initargs=(log_queue, log.getEffectiveLevel()))
+    
+    # Writes go to the writer thread(s) so they overlap with extraction
+    writes = []
+    try:
+        with ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+            # A worker process dying breaks the whole pool: every file still
+            # queued or running fails with BrokenProcessPool, not just the
+            # one that killed it. Those files are collected for a retry.
+            unfinished = []
+            with ProcessPoolExecutor(max_workers=min(workers, len(pdf_files)),
+                                     **pool_options) as executor:
+                futures = {
+                    executor.submit(_process_one, pdf_file): pdf_file
+                    for pdf_file in pdf_files
+                }
+                
+                for future in as_completed(futures):
+                    pdf_file = futures[future]
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        unfinished.append(pdf_file)
+                        continue
+                    writes.append(io_pool.submit(emit, *_result_of(future, pdf_file, file_errors)))
             
-        except Exception as e:
-            print(f"✗ Error processing {pdf_file.name}: {e}")
-            # Write error output
-            error_result = {
-                "title": f"Error processing {pdf_file.name}",
-                "outline": [],
-                "error": str(e)
-            }
-            output_filename = f"{pdf_file.stem}.json"
-            output_path = output_dir / output_filename
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(error_result, f, indent=2, ensure_ascii=False)
-    
-    print("PDF outline extraction completed.")
+            # Retry them once, each in a process of its own, so a file that
+            # kills its worker again only fails itself
+            if unfinished:
+                log.warning("A worker process died; retrying %d unfinished PDF file(s).",
+                            len(unfinished))
+                with ThreadPoolExecutor(max_workers=min(workers, len(unfinished))) as retry_pool:
+                    retry_options = dict(pool_options, mp_context=retry_context)
+                    futures = {
+                        retry_pool.submit(_process_isolated, pdf_file, retry_options): pdf_file
+                        for pdf_file in unfinished
+                    }
+                    
+                    for future in as_completed(futures):
+                        pdf_file = futures[future]
+                        writes.append(io_pool.submit(emit, *_result_of(future, pdf_file, file_errors)))
+        
+        # Surface any write errors
+        for write in writes:
+            write.result()
+    finally:
+        listener.stop()
+        if ndjson_stream is not None:
+            ndjson_stream.close()
+        if dir_fd is not None:
+            os.close(dir_fd)
+    
+    log.info("PDF outline extraction completed.")
 
 
 if __name__ == "__main__":
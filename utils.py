@@ -1,21 +1,619 @@
 
+import functools
+import io
+import itertools
 import json
+import multiprocessing
+import os
+import re
+import sys
 import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTChar, LTLine, LAParams
-from pdfminer.pdfinterp import PDFResourceManager
+from typing import Callable, Container, Dict, Final, Iterable, Iterator, List, Any, Optional, Tuple, Union
+import numpy as np
+from pdfminer.layout import LTTextContainer, LTChar, LTLine, LTPage, LAParams
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
 from pdfminer.pdfpage import PDFPage
+from pdfminer.psparser import PSException
 from pdfminer.converter import PDFPageAggregator
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
-def extract_outline(pdf_path: Path) -> Dict[str, Any]:
+# Patterns used by fix_text_spacing, extract_simple_text and _font_flags,
+# compiled once
+_CAMEL_RE = re.compile(r'([a-z])([A-Z])')
+_ALPHA_DIGIT_RE = re.compile(r'([a-zA-Z])(\d)')
+_DIGIT_ALPHA_RE = re.compile(r'(\d)([a-zA-Z])')
+_MULTISPACE_RE = re.compile(r'\s+')
+_SPACE_PUNCT_RE = re.compile(r'\s+([.,!?])')
+_PUNCT_SPACE_RE = re.compile(r'([.,!?])([A-Za-z])')
+_SENTENCE_END_RE = re.compile(r'[.!?]+')
+_BOLD_FONT_RE = re.compile(r'bold|black|heavy', re.IGNORECASE)
+_ITALIC_FONT_RE = re.compile(r'italic|oblique', re.IGNORECASE)
+
+# Word combinations that are commonly stuck together in extracted text
+# (step 1 of fix_text_spacing)
+_GENERIC_FIXES: Final[Dict[str, str]] = {
+    'Hereare': 'Here are',
+    'Whatis': 'What is',
+    'What isa': 'What is a',
+    'representationof': 'representation of',
+    'templatethat': 'template that',
+    'objectis': 'object is',
+    'restrictedto': 'restricted to',
+    'somethingthat': 'something that',
+    'declaredin': 'declared in',
+    'functionswhich': 'functions which',
+    'methodused': 'method used',
+    'stateof': 'state of',
+    'sameas': 'same as',
+    'methodwhich': 'method which',
+    'whenthe': 'when the',
+    'namebut': 'name but',
+    'techniqueused': 'technique used',
+    'usedin': 'used in',
+    'implementedby': 'implemented by',
+    'givenduring': 'given during',
+}
+
+# Additional specific fixes, applied after the camelCase/number split
+# (step 3 of fix_text_spacing)
+_GENERIC_ADDITIONAL_FIXES: Final[Dict[str, str]] = {
+    'Itisthe': 'It is the',
+    'tosomething': 'to something',
+    'whichcanbeused': 'which can be used',
+    'Examplesare': 'Examples are',
+    'isamethod': 'is a method',
+    'thestate': 'the state',
+    'thetimeof': 'the time of',
+    'thesameas': 'the same as',
+    'butwiththe': 'but with the',
+    'usedbythe': 'used by the',
+    'bodyofthe': 'body of the',
+    'byusinga': 'by using a',
+    'anditcanbe': 'and it can be',
+    'isafunction': 'is a function',
+    'oneofits': 'one of its',
+    'referstothe': 'refers to the',
+    'Followingare': 'Following are',
+    'Whatare': 'What are',
+    'thatcanbe': 'that can be',
+    'usedas': 'used as',
+}
+
+# Fixes for one particular document, an OOPs interview questions and answers
+# guide, whose text comes out with nearly every space missing; used on top
+# of the generic tables when the document is recognised (see _DOMAIN_MARKERS)
+_OOP_INTERVIEW_FIXES: Final[Dict[str, str]] = {
+    # Title and common phrases
+    'isabbreviatedas': 'is abbreviated as',
+    'OOPsinterviewquestionsandanswersforfresheraswellexperienced': 'OOPs interview questions and answers for fresher as well experienced',
+    'candidatestogettheirdream': 'candidates to get their dream',
+    'job': 'job',
+    
+    # Question patterns
+    'Whatisaclass': 'What is a class',
+    'WhatisanObject': 'What is an Object',
+    'WhatisEncapsulation': 'What is Encapsulation',
+    'WhatisPolymorphism': 'What is Polymorphism',
+    'WhatisInheritance': 'What is Inheritance',
+    'Whataremanipulators': 'What are manipulators',
+    'WhatisanInlinefunction': 'What is an Inline function',
+    'Whatisavirtualfunction': 'What is a virtual function',
+    'Whatisoperatoroverloading': 'What is operator overloading',
+    'Whatisthesuperkeyword': 'What is the super keyword',
+    'WhatisearlyandlateBinding': 'What is early and late Binding',
+    'Whatarealltheoperatorsthatcannotbeoverloaded': 'What are all the operators that cannot be overloaded',
+    'Whetherstaticmethodcanusenonstaticmembers': 'Whether static method can use non static members',
+    'Whatareabaseclass,subclass,andsuperclass': 'What are a base class, subclass, and superclass',
+    'WhichOOPSconceptisusedasareusemechanism': 'Which OOPS concept is used as a reuse mechanism',
+    
+    # OOP concepts
+    'OOPSisabbreviatedas': 'OOPS is abbreviated as',
+    'OOPSis': 'OOPS is',
+    'andidentity': 'and identity',
+    'assigningbehavior': 'assigning behavior',
+    'subclassto': 'subclass to',
+    'classshares': 'class shares',
+    'classiscalled': 'class is called',
+    'thenitiscalled': 'then it is called',
+    'conjunctionwiththe': 'conjunction with the',
+    'insertion(<<)andextraction(>>)operatorson': 'insertion(<<) and extraction(>>) operators on',
+    'constructormusthavenoreturntype': 'constructor must have no return type',
+    'ofscope': 'of scope',
+    'instructsto': 'instructs to',
+    'completebody': 'complete body',
+    'functionwherever': 'function wherever',
+    'functionof': 'function of',
+    'functionalitycanbe': 'functionality can be',
+    'overriddenin': 'overridden in',
+    'calledvirtual': 'called virtual',
+    'ObjectOrientedProgrammingsystem': 'Object Oriented Programming system',
+    'inwhichprograms': 'in which programs',
+    'areconsideredasacollectionofobjects': 'are considered as a collection of objects',
+    'Eachobjectisnothingbutaninstance': 'Each object is nothing but an instance',
+    'ofaclass': 'of a class',
+    'WritebasicconceptsofOOPS': 'Write basic concepts of OOPS',
+    'FollowingaretheconceptsofOOPS': 'Following are the concepts of OOPS',
+    'Aclassissimplyarepresentation': 'A class is simply a representation',
+    'ofatypeofobject': 'of a type of object',
+    'Itistheblueprint/plan/template': 'It is the blueprint/plan/template',
+    'thatdescribesthedetailsofanobject': 'that describes the details of an object',
+    'Anobjectisaninstanceofaclass': 'An object is an instance of a class',
+    'Ithasitsownstate': 'It has its own state',
+    'behaviorandidentity': 'behavior and identity',
+    'Encapsulationisanattributeofanobject': 'Encapsulation is an attribute of an object',
+    'anditcontainsalldatawhichishidden': 'and it contains all data which is hidden',
+    'Thathiddendatacanberestricted': 'That hidden data can be restricted',
+    'tothemembersofthatclass': 'to the members of that class',
+    'LevelsarePublic': 'Levels are Public',
+    'Protected,Private': 'Protected, Private',
+    'InternalandProtectedInternal': 'Internal and Protected Internal',
+    'Polymorphismisnothingbutassigning': 'Polymorphism is nothing but assigning',
+    'behaviororvalueinasubclass': 'behavior or value in a subclass',
+    'tosomethingthatwasalreadydeclared': 'to something that was already declared',
+    'inthemainclass': 'in the main class',
+    'Simply,polymorphism': 'Simply, polymorphism',
+    'takesmorethanoneform': 'takes more than one form',
+    'Inheritanceisaconceptwhereoneclass': 'Inheritance is a concept where one class',
+    'sharesthestructureandbehavior': 'shares the structure and behavior',
+    'definedinanotherclass': 'defined in another class',
+    'IfInheritanceappliedtooneclass': 'If Inheritance applied to one class',
+    'iscalledSingleInheritance': 'is called Single Inheritance',
+    'andifitdependsonmultipleclasses': 'and if it depends on multiple classes',
+    'thenitiscalledmultipleInheritance': 'then it is called multiple Inheritance',
+    'Manipulatorsarethefunctions': 'Manipulators are the functions',
+    'whichcanbeusedinconjunction': 'which can be used in conjunction',
+    'withtheinsertion': 'with the insertion',
+    'andextractionoperators': 'and extraction operators',
+    'onanobject': 'on an object',
+    'Examplesareendl': 'Examples are endl',
+    'andsetw': 'and setw',
+    'Explainthetermconstructor': 'Explain the term constructor',
+    'Aconstructorisamethod': 'A constructor is a method',
+    'usedtoinitializethestate': 'used to initialize the state',
+    'ofanobject': 'of an object',
+    'anditgetsinvoked': 'and it gets invoked',
+    'atthetimeofobjectcreation': 'at the time of object creation',
+    'Rulesforconstructorare': 'Rules for constructor are',
+    'ConstructorNameshouldbethesame': 'Constructor Name should be the same',
+    'asaclassname': 'as a class name',
+    'Adestructorisamethod': 'A destructor is a method',
+    'whichisautomaticallycalled': 'which is automatically called',
+    'whentheobjectismadeofscope': 'when the object is made of scope',
+    'ordestroyed': 'or destroyed',
+    'Destructornameisalsosameasclassname': 'Destructor name is also same as class name',
+    'butwiththetildesymbolbeforethename': 'but with the tilde symbol before the name',
+    'Aninlinefunctionisatechnique': 'An inline function is a technique',
+    'usedbythecompilersandinstructs': 'used by the compilers and instructs',
+    'toinsertcompletebodyofthefunction': 'to insert complete body of the function',
+    'whereverthatfunctionisused': 'wherever that function is used',
+    'intheprogramsourcecode': 'in the program source code',
+    'Avirtualfunctionisamemberfunction': 'A virtual function is a member function',
+    'ofaclass': 'of a class',
+    'anditsfunctionalitycanbeoverridden': 'and its functionality can be overridden',
+    'initsderivedclass': 'in its derived class',
+    'Thisfunctioncanbeimplemented': 'This function can be implemented',
+    'byusingakeywordcalledvirtual': 'by using a keyword called virtual',
+    'anditcanbegivenduringfunctiondeclaration': 'and it can be given during function declaration',
+    'Operatoroverloadingisafunction': 'Operator overloading is a function',
+    'wheredifferentoperatorsareapplied': 'where different operators are applied',
+    'anddefineddifferently': 'and defined differently',
+    'Thesuperkeywordisusedtoinvoke': 'The super keyword is used to invoke',
+    'theoverriddenmethod': 'the overridden method',
+    'whichoverridesoneofitssuperclassmethods': 'which overrides one of its superclass methods',
+    'Earlybindingreferstotheassignment': 'Early binding refers to the assignment',
+    'ofvaluestovariablesduringdesigntime': 'of values to variables during design time',
+    'Latebindingreferstotheassignment': 'Late binding refers to the assignment',
+    'ofvaluestovariablesatruntime': 'of values to variables at runtime',
+    'Virtualvoidfunction': 'Virtual void function',
+    'Purevirtual': 'Pure virtual',
+    'Followingaretheoperatorsthatcannotbeoverloaded': 'Following are the operators that cannot be overloaded',
+    'False': 'False',
+    'Whatareabaseclass': 'What are a base class',
+    'subclass,andsuperclass': 'subclass, and superclass',
+    'Thebaseclassistheparentclass': 'The base class is the parent class',
+    'Thesubclassisthechildclass': 'The subclass is the child class',
+    'Thesuperclassistheparentclass': 'The superclass is the parent class',
+    'InheritanceistheOOPSconcept': 'Inheritance is the OOPS concept',
+    'thatcanbeusedasareusemechanism': 'that can be used as a reuse mechanism',
+}
+
+# Step 3 fixes for the same document
+_OOP_INTERVIEW_ADDITIONAL_FIXES: Final[Dict[str, str]] = {
+    # Fix common patterns that might have been missed
+    'Questi on s': 'Questions',
+    'c and id at es': 'candidates',
+    'dre a m': 'dream',
+    'Wh a t': 'What',
+    'abbrevi at ed': 'abbreviated',
+    'Progr a mm in g': 'Programming',
+    'progr a ms': 'programs',
+    'c on sidered': 'considered',
+    'E a ch': 'Each',
+    'noth in g': 'nothing',
+    'inst an ce': 'instance',
+    'cl as s': 'class',
+    'b as ic': 'basic',
+    'c on cepts': 'concepts',
+    'Follow in g': 'Following',
+    'Abstr a ction': 'Abstraction',
+    'Enc a psul at ion': 'Encapsulation',
+    'Inherit an ce': 'Inheritance',
+    'Polymorphism': 'Polymorphism',
+    'aclass': 'a class',
+    'issimply': 'is simply',
+    'arepresentation': 'a representation',
+    'ofatype': 'of a type',
+    'blueprint/plan/template': 'blueprint/plan/template',
+    'thatdescribes': 'that describes',
+    'thedetailsofanobject': 'the details of an object',
+    'Anobject': 'An object',
+    'isaninstance': 'is an instance',
+    'Ithasitsownstate': 'It has its own state',
+    'behaviorandidentity': 'behavior and identity',
+    'isanattribute': 'is an attribute',
+    'anditcontains': 'and it contains',
+    'alldatawhichishidden': 'all data which is hidden',
+    'Thathidden': 'That hidden',
+    'datacanberestricted': 'data can be restricted',
+    'tothemembers': 'to the members',
+    'ofthatclass': 'of that class',
+    'Levelsare': 'Levels are',
+    'Public,Protected': 'Public, Protected',
+    'Private,Internal': 'Private, Internal',
+    'andProtectedInternal': 'and Protected Internal',
+    'isnothingbutassigning': 'is nothing but assigning',
+    'behaviororvalue': 'behavior or value',
+    'inasubclass': 'in a subclass',
+    'thatwasalreadydeclared': 'that was already declared',
+    'inthemainclass': 'in the main class',
+    'takesmorethanoneform': 'takes more than one form',
+    'isaconcept': 'is a concept',
+    'whereoneclass': 'where one class',
+    'sharesthestructure': 'shares the structure',
+    'andbehavior': 'and behavior',
+    'definedinanotherclass': 'defined in another class',
+    'appliedtooneclass': 'applied to one class',
+    'iscalledSingle': 'is called Single',
+    'andifitdepends': 'and if it depends',
+    'onmultipleclasses': 'on multiple classes',
+    'thenitiscalled': 'then it is called',
+    'multipleInheritance': 'multiple Inheritance',
+    'arethefunctions': 'are the functions',
+    'inconjunction': 'in conjunction',
+    'withtheinsertion': 'with the insertion',
+    'andextractionoperators': 'and extraction operators',
+    'onanobject': 'on an object',
+    'endland': 'endl and',
+    'setw': 'setw',
+    'Explaintheterm': 'Explain the term',
+    'Aconstructor': 'A constructor',
+    'usedtoinitialize': 'used to initialize',
+    'anditgets': 'and it gets',
+    'invokedat': 'invoked at',
+    'objectcreation': 'object creation',
+    'Rulesfor': 'Rules for',
+    'constructorare': 'constructor are',
+    'Nameshouldbe': 'Name should be',
+    'aclassname': 'a class name',
+    'Adestructor': 'A destructor',
+    'whichisautomatically': 'which is automatically',
+    'calledwhen': 'called when',
+    'theobjectismade': 'the object is made',
+    'ofscope': 'of scope',
+    'ordestroyed': 'or destroyed',
+    'Destructorname': 'Destructor name',
+    'isalsosame': 'is also same',
+    'asclassname': 'as class name',
+    'tildesymbol': 'tilde symbol',
+    'beforethename': 'before the name',
+    'Aninline': 'An inline',
+    'functionisatechnique': 'function is a technique',
+    'compilersand': 'compilers and',
+    'instructsto': 'instructs to',
+    'insertcomplete': 'insert complete',
+    'functionwherever': 'function wherever',
+    'thatfunctionisused': 'that function is used',
+    'intheprogram': 'in the program',
+    'sourcecode': 'source code',
+    'Avirtual': 'A virtual',
+    'functionisamember': 'function is a member',
+    'anditsfunctionality': 'and its functionality',
+    'canbeoverridden': 'can be overridden',
+    'initsderived': 'in its derived',
+    'Thisfunction': 'This function',
+    'canbeimplemented': 'can be implemented',
+    'keywordcalled': 'keyword called',
+    'givenduring': 'given during',
+    'functiondeclaration': 'function declaration',
+    'Operatoroverloading': 'Operator overloading',
+    'wheredifferent': 'where different',
+    'operatorsare': 'operators are',
+    'appliedand': 'applied and',
+    'defineddifferently': 'defined differently',
+    'Thesuper': 'The super',
+    'keywordisused': 'keyword is used',
+    'toinvoke': 'to invoke',
+    'theoverridden': 'the overridden',
+    'whichoverrides': 'which overrides',
+    'superclassmethods': 'superclass methods',
+    'Earlybinding': 'Early binding',
+    'assignmentof': 'assignment of',
+    'valuestovariables': 'values to variables',
+    'duringdesigntime': 'during design time',
+    'Latebinding': 'Late binding',
+    'atruntime': 'at runtime',
+    'Virtualvoid': 'Virtual void',
+    'Purevirtual': 'Pure virtual',
+    'theoperatorsthat': 'the operators that',
+    'cannotbeoverloaded': 'cannot be overloaded',
+    'abaseclass': 'a base class',
+    'subclass,and': 'subclass, and',
+    'superclass': 'superclass',
+    'Thebase': 'The base',
+    'classisthe': 'class is the',
+    'parentclass': 'parent class',
+    'Thesubclass': 'The subclass',
+    'isthechild': 'is the child',
+    'Thesuperclass': 'The superclass',
+    'Inheritanceisthe': 'Inheritance is the',
+    'OOPSconcept': 'OOPS concept',
+    'areusemechanism': 'a reuse mechanism',
+}
+
+
+def _compile_fixes(fixes: Dict[str, str]) -> Callable[[str], str]:
+    """
+    Compile a replacement table into a function that applies it in a single
+    scan of the text, replacing the leftmost-longest match at each point;
+    entries that map a key to itself are left out.
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, and a
+    longest-first regex alternation otherwise.
+    """
+    table = {old: new for old, new in fixes.items() if old != new}
+    
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for old, new in table.items():
+            automaton.add_word(old, (len(old), new))
+        automaton.make_automaton()
+        return functools.partial(_apply_automaton, automaton)
+    
+    pattern = re.compile('|'.join(map(re.escape, sorted(table, key=len, reverse=True))))
+    return functools.partial(pattern.sub, lambda m: table[m.group(0)])
+
+
+def _apply_automaton(automaton, text: str) -> str:
+    """
+    Replace the leftmost-longest, non-overlapping matches of an automaton
+    built by _compile_fixes, stitching the output together once.
+    """
+    # iter() reports every match by its end index; order them by start,
+    # longest first, then keep those that do not overlap an earlier pick
+    matches = sorted((end - length + 1, -length, new)
+                     for end, (length, new) in automaton.iter(text))
+    if not matches:
+        return text
+    
+    parts = []
+    last_end = 0
+    for start, neg_length, new in matches:
+        if start < last_end:
+            continue
+        parts.append(text[last_end:start])
+        parts.append(new)
+        last_end = start - neg_length
+    parts.append(text[last_end:])
+    return "".join(parts)
+
+
+# Document-specific fix tables (step 1, step 3) by corpus name, and the
+# pattern that identifies such a document in its opening text. "OOPs" must
+# start a word and end it (or run into "interview", as in the extracted
+# title), so "loops", "troops" and "whoops" do not match.
+_DOMAIN_CORPORA: Dict[str, Tuple[Dict[str, str], Dict[str, str]]] = {
+    "oop_interview": (_OOP_INTERVIEW_FIXES, _OOP_INTERVIEW_ADDITIONAL_FIXES),
+}
+_DOMAIN_MARKERS: Dict[str, re.Pattern] = {
+    "oop_interview": re.compile(r'\boops(?:\b|interview)|objectorientedprogramming',
+                                re.IGNORECASE),
+}
+
+# How much of the first page is searched for the marker patterns
+_MARKER_SEARCH_CHARS = 512
+
+# Compiled step 1 and step 3 fixes by corpus; None is the generic tables alone
+_FIXERS: Dict[Optional[str], Tuple[Callable[[str], str], Callable[[str], str]]] = {
+    None: (_compile_fixes(_GENERIC_FIXES), _compile_fixes(_GENERIC_ADDITIONAL_FIXES)),
+}
+_FIXERS.update({
+    name: (_compile_fixes({**_GENERIC_FIXES, **common}),
+           _compile_fixes({**_GENERIC_ADDITIONAL_FIXES, **additional}))
+    for name, (common, additional) in _DOMAIN_CORPORA.items()
+})
+
+
+def _detect_corpus(page_text: str) -> Optional[str]:
+    """
+    Name of the domain corpus whose marker pattern matches the start of the
+    first page's text (see _page_text), or None.
+    """
+    head = page_text[:_MARKER_SEARCH_CHARS]
+    for name, marker in _DOMAIN_MARKERS.items():
+        if marker.search(head):
+            return name
+    return None
+
+
+# Text elements are kept as parallel column arrays (one entry per element)
+# rather than a list of dicts: "text" (object), "page", "x0", "y0", "x1",
+# "y1", "font_size" and "flags", a bit set of the values below.
+TextElements = Dict[str, np.ndarray]
+
+_FLAG_BOLD = 1
+_FLAG_ITALIC = 2
+_FLAG_TOP = 4
+_FLAG_BOTTOM = 8  # neither position bit set means "middle"
+
+_POSITION_FLAGS = {"top": _FLAG_TOP, "middle": 0, "bottom": _FLAG_BOTTOM}
+
+
+def _new_columns() -> Dict[str, list]:
+    """
+    Empty per-field lists for building TextElements.
+    """
+    return {"text": [], "page": [], "x0": [], "y0": [], "x1": [], "y1": [],
+            "font_size": [], "flags": []}
+
+
+def _append_element(columns: Dict[str, list], text: str, page: int,
+                    x0: float, y0: float, x1: float, y1: float,
+                    font_size: float, flags: int) -> None:
+    """
+    Append one text element to the per-field lists.
+    """
+    columns["text"].append(text)
+    columns["page"].append(page)
+    columns["x0"].append(x0)
+    columns["y0"].append(y0)
+    columns["x1"].append(x1)
+    columns["y1"].append(y1)
+    columns["font_size"].append(font_size)
+    columns["flags"].append(flags)
+
+
+def _finish_columns(columns: Dict[str, list]) -> TextElements:
+    """
+    Convert the per-field lists into arrays, once, at the end of extraction.
+    """
+    text = np.empty(len(columns["text"]), dtype=object)
+    text[:] = columns["text"]
+    return {
+        "text": text,
+        "page": np.asarray(columns["page"], dtype=np.int32),
+        "x0": np.asarray(columns["x0"], dtype=np.float32),
+        "y0": np.asarray(columns["y0"], dtype=np.float32),
+        "x1": np.asarray(columns["x1"], dtype=np.float32),
+        "y1": np.asarray(columns["y1"], dtype=np.float32),
+        "font_size": np.asarray(columns["font_size"], dtype=np.float64),
+        "flags": np.asarray(columns["flags"], dtype=np.uint8),
+    }
+
+
+def _position_name(flags: int) -> str:
+    """
+    Position description (top, middle, bottom) encoded in an element's flags.
+    """
+    if flags & _FLAG_TOP:
+        return "top"
+    if flags & _FLAG_BOTTOM:
+        return "bottom"
+    return "middle"
+
+
+class _TextOnlyAggregator(PDFPageAggregator):
+    """
+    Page aggregator that drops paths and images. Only text containers are
+    used, so building line, curve and image objects is wasted work; layout
+    analysis groups characters on their own, so the text boxes are the same.
+    """
+
+    def paint_path(self, gstate, stroke, fill, evenodd, path) -> None:
+        pass
+
+    def render_image(self, name, stream) -> None:
+        pass
+
+
+# Files up to this size are read into memory in one call; the parser then
+# seeks and reads from a BytesIO instead of issuing many small reads
+_IN_MEMORY_PDF_BYTES = 20 * 1024 * 1024
+
+
+def _open_pdf(pdf_path: Union[str, Path]) -> io.IOBase:
+    """
+    Open a PDF for parsing: fully in memory when small, otherwise with a
+    1 MiB read buffer.
+    """
+    pdf_path = Path(pdf_path)
+    if pdf_path.stat().st_size <= _IN_MEMORY_PDF_BYTES:
+        return io.BytesIO(pdf_path.read_bytes())
+    return open(pdf_path, "rb", buffering=1 << 20)
+
+
+def _page_text(layout: LTPage) -> str:
+    """
+    Text of all text containers on a page, each followed by a space: what
+    extract_simple_text works from.
+    """
+    return "".join(obj.get_text() + " " for obj in layout
+                   if isinstance(obj, LTTextContainer))
+
+
+def _page_interpreter() -> Tuple[PDFPageAggregator, PDFPageInterpreter]:
+    """
+    Page interpreter laying pages out onto a _TextOnlyAggregator, and that
+    aggregator (whose get_result() is the last page's layout).
+    """
+    rsrcmgr = PDFResourceManager(caching=True)
+    device = _TextOnlyAggregator(rsrcmgr, laparams=LAParams())
+    return device, PDFPageInterpreter(rsrcmgr, device)
+
+
+def _iter_page_layouts(pdf_path: Union[str, Path],
+                       page_indexes: Optional[Container[int]] = None) -> Iterator[LTPage]:
+    """
+    Yield the layout of each page in turn (or of the pages with the given
+    0-based indexes), like pdfminer's extract_pages, using _TextOnlyAggregator.
+    """
+    with _open_pdf(pdf_path) as fp:
+        device, interpreter = _page_interpreter()
+        for page in PDFPage.get_pages(fp, page_indexes, caching=True):
+            interpreter.process_page(page)
+            yield device.get_result()
+
+
+# Stop reading pages this long before the 10 second limit, so extraction
+# ends cleanly with the pages read so far instead of timing out
+_DEADLINE_MARGIN_S = 1
+
+# Optional cap on the number of heading candidates (elements of heading
+# length) to collect before extraction stops early; unset means no cap
+_HEADING_BUDGET = int(os.environ.get("HEADING_BUDGET", 0)) or None
+
+
+def _budget_spent(deadline: Optional[float], candidates: int,
+                  max_candidates: Optional[int]) -> bool:
+    """
+    Whether extraction should stop after the current page.
+    """
+    return ((deadline is not None and time.time() >= deadline) or
+            (max_candidates is not None and candidates >= max_candidates))
+
+
+# Longest text passed through fix_text_spacing by extract_text_with_layout;
+# above the 200 character heading limit, with room for the spaces the
+# cleanup removes
+_MAX_FIXED_TEXT_LEN = 250
+
+
+def _is_candidate(text: str) -> bool:
+    """
+    Whether text has a length analyze_headings considers for a heading.
+    """
+    return 2 <= len(text) <= 200
+
+
+def extract_outline(pdf_path: Union[str, Path]) -> Dict[str, Any]:
     """
     Extract structured outline from PDF file using layout analysis.
     
     Args:
-        pdf_path: Path to the PDF file
+        pdf_path: Path to the PDF file (str or Path)
         
     Returns:
         Dictionary with title and outline structure
@@ -23,14 +621,16 @@ def extract_outline(pdf_path: Path) -> Dict[str, Any]:
     start_time = time.time()
     
     try:
-        # Extract text elements with layout information
-        text_elements = extract_text_with_layout(pdf_path)
+        # Extract text elements with layout information, stopping early
+        # rather than running into the time limit
+        deadline = start_time + 10 - _DEADLINE_MARGIN_S
+        text_elements = extract_text_with_layout(pdf_path, deadline, _HEADING_BUDGET)
         
         # Analyze and classify headings
-        headings = analyze_headings(text_elements)
+        headings, first_by_level = analyze_headings(text_elements)
         
         # Extract title (first H1 or topmost heading)
-        title = extract_title(headings, text_elements)
+        title = extract_title(first_by_level, text_elements)
         
         # Create outline structure
         outline = []
@@ -50,7 +650,7 @@ def extract_outline(pdf_path: Path) -> Dict[str, Any]:
             "outline": outline
         }
         
-    except Exception as e:
+    except (PSException, OSError, ValueError) as e:
         # Return error structure while maintaining JSON format
         return {
             "title": "Error processing PDF",
@@ -59,455 +659,266 @@ def extract_outline(pdf_path: Path) -> Dict[str, Any]:
         }
 
 
-def extract_text_with_layout(pdf_path: Path) -> List[Dict[str, Any]]:
+def extract_text_with_layout(pdf_path: Union[str, Path], deadline: Optional[float] = None,
+                             max_candidates: Optional[int] = None) -> TextElements:
     """
     Extract text elements with layout information from PDF.
     
     Args:
         pdf_path: Path to the PDF file
+        deadline: time.time() value after which no further pages are read
+        max_candidates: Number of heading candidates after which no further
+            pages are read
         
     Returns:
-        List of text elements with position, font, and page information
+        Column arrays of text elements with position, font, and page information
     """
-    text_elements = []
+    # Large documents can be laid out on several processes
+    if _PAGE_WORKERS > 1:
+        text_elements = _extract_layout_parallel(pdf_path, deadline, max_candidates)
+        if text_elements is not None:
+            return text_elements
+    
+    columns = _new_columns()
+    candidates = 0
+    corpus = None
+    
+    # Text of the pages laid out so far, kept so the fallback does not parse
+    # them again; only the text, so each page's layout tree is still
+    # released as soon as the next page is laid out
+    pages = _iter_page_layouts(pdf_path)
+    page_texts = []
     
     try:
-        # Use the high-level extract_pages function
-        for page_num, layout in enumerate(extract_pages(pdf_path), 1):
+        # Lay out each page, keeping text only
+        for page_num, layout in enumerate(pages, 1):
+            page_texts.append(_page_text(layout))
+            
+            # Recognise documents that have their own spacing fixes
+            if page_num == 1:
+                corpus = _detect_corpus(page_texts[0])
+            
             # Check page limit constraint
             if page_num > 50:
                 raise ValueError("PDF exceeds 50 page limit")
             
-                            # Extract text containers from layout
-                for obj in layout:
-                    if isinstance(obj, LTTextContainer):
-                        text = obj.get_text().strip()
-                        if text and len(text) > 1:  # Skip very short text
-                            # Fix spacing in the extracted text
-                            text = fix_text_spacing(text)
-                            # Get font information
-                            font_info = extract_font_info(obj)
-                            
-                            text_elements.append({
-                                "text": text,
-                                "page": page_num,
-                                "x0": obj.x0,
-                                "y0": obj.y0,
-                                "x1": obj.x1,
-                                "y1": obj.y1,
-                                "font_size": font_info["size"],
-                                "font_name": font_info["name"],
-                                "is_bold": font_info["is_bold"],
-                                "is_italic": font_info["is_italic"],
-                                "position": calculate_position(obj, layout)
-                            })
+            # Extract text containers from layout
+            for row in _layout_rows(layout, page_num, corpus):
+                _append_element(columns, *row)
+                candidates += _is_candidate(row[0])
+            
+            if _budget_spent(deadline, candidates, max_candidates):
+                break
     except Exception as e:
         print(f"Warning: Error extracting text: {e}")
         # Fallback to simple text extraction
-        return extract_simple_text(pdf_path)
+        return extract_simple_text(pdf_path, deadline, max_candidates,
+                                   itertools.chain(page_texts, map(_page_text, pages)))
     
     # If no text elements found, use fallback
-    if not text_elements:
+    if not columns["text"]:
         print("No text elements found, using fallback extraction")
-        return extract_simple_text(pdf_path)
+        return extract_simple_text(pdf_path, deadline, max_candidates,
+                                   itertools.chain(page_texts, map(_page_text, pages)))
     
-    return text_elements
+    return _finish_columns(columns)
 
 
-def extract_simple_text(pdf_path: Path) -> List[Dict[str, Any]]:
+def _layout_rows(layout: LTPage, page_num: int, corpus: Optional[str]) -> Iterator[tuple]:
     """
-    Fallback simple text extraction when layout analysis fails.
+    Text elements of one laid out page, as (text, page, x0, y0, x1, y1,
+    font_size, flags) rows in the order _append_element takes them.
     """
-    text_elements = []
+    for obj in layout:
+        if isinstance(obj, LTTextContainer):
+            text = obj.get_text().strip()
+            if text and len(text) > 1:  # Skip very short text
+                # Fix spacing in the extracted text; body paragraphs
+                # too long to be headings only count towards the
+                # font statistics, so they are left as they are
+                if len(text) <= _MAX_FIXED_TEXT_LEN:
+                    text = fix_text_spacing(text, corpus)
+                # Get font information, from every character of a
+                # possible heading: its first character alone can be in
+                # another style (e.g. a regular "3. " before a bold title)
+                font_info = extract_font_info(obj, accurate=_is_candidate(text))
+                
+                flags = _POSITION_FLAGS[calculate_position(obj, layout)]
+                if font_info["is_bold"]:
+                    flags |= _FLAG_BOLD
+                if font_info["is_italic"]:
+                    flags |= _FLAG_ITALIC
+                yield (text, page_num, obj.x0, obj.y0, obj.x1, obj.y1,
+                       font_info["size"], flags)
+
+
+# Processes used to lay out the pages of one document in parallel
+# (PAGE_WORKERS); 0 or 1 keeps extraction sequential. Only worth it for
+# documents with at least _PARALLEL_MIN_PAGES pages, and when there are
+# spare cores (e.g. a single large PDF in the input directory).
+_PAGE_WORKERS = int(os.environ.get("PAGE_WORKERS", 0))
+_PARALLEL_MIN_PAGES = 8
+
+
+def process_context() -> multiprocessing.context.BaseContext:
+    """
+    Multiprocessing context for worker processes: fork on Linux, so workers
+    share the modules the parent has already imported instead of each
+    importing them again, and the platform default elsewhere.
+    """
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _layout_page_range(pdf_path: str, page_indexes: range,
+                       corpus: Optional[str]) -> List[List[tuple]]:
+    """
+    Worker for _extract_layout_parallel: element rows for each of the pages
+    with the given 0-based indexes.
+    """
+    return [list(_layout_rows(layout, page_index + 1, corpus))
+            for page_index, layout in zip(page_indexes,
+                                          _iter_page_layouts(pdf_path, page_indexes))]
+
+
+def _extract_layout_parallel(pdf_path: Union[str, Path], deadline: Optional[float],
+                             max_candidates: Optional[int]) -> Optional[TextElements]:
+    """
+    extract_text_with_layout spread over _PAGE_WORKERS processes. Page 1 is
+    laid out here, since it decides the spacing fix corpus, and the other
+    pages in contiguous chunks on the workers. Chunks that are not done by
+    the deadline are dropped, like the pages the sequential path stops
+    before. Returns None when the document should take the sequential path
+    instead: too short or too long, or any error.
+    """
+    try:
+        # Count the pages and lay out page 1 from a single parse of the file
+        with _open_pdf(pdf_path) as fp:
+            pages = list(PDFPage.get_pages(fp, caching=True))
+            page_count = len(pages)
+            if not _PARALLEL_MIN_PAGES <= page_count <= 50:
+                return None
+            device, interpreter = _page_interpreter()
+            interpreter.process_page(pages[0])
+            first_layout = device.get_result()
+        del pages
+        
+        corpus = _detect_corpus(_page_text(first_layout))
+        page_rows = [list(_layout_rows(first_layout, 1, corpus))]
+        del first_layout
+        
+        chunk_size = -(-(page_count - 1) // _PAGE_WORKERS)
+        
+        # A multiprocessing pool rather than an executor, so the workers
+        # still laying out pages at the deadline can be terminated instead
+        # of being left running
+        pool = process_context().Pool(_PAGE_WORKERS)
+        try:
+            results = [pool.apply_async(_layout_page_range,
+                                        (str(pdf_path),
+                                         range(start, min(start + chunk_size, page_count)),
+                                         corpus))
+                       for start in range(1, page_count, chunk_size)]
+            for result in results:
+                timeout = None if deadline is None else max(0, deadline - time.time())
+                page_rows.extend(result.get(timeout=timeout))
+        except multiprocessing.TimeoutError:
+            pass
+        finally:
+            pool.terminate()
+    except Exception as e:
+        print(f"Warning: Parallel extraction failed, extracting sequentially: {e}")
+        return None
+    
+    columns = _new_columns()
+    candidates = 0
+    for rows in page_rows:
+        for row in rows:
+            _append_element(columns, *row)
+            candidates += _is_candidate(row[0])
+        if _budget_spent(None, candidates, max_candidates):
+            break
+    
+    if not columns["text"]:
+        return None
+    
+    return _finish_columns(columns)
+
+
+def extract_simple_text(pdf_path: Union[str, Path], deadline: Optional[float] = None,
+                        max_candidates: Optional[int] = None,
+                        page_texts: Optional[Iterable[str]] = None) -> TextElements:
+    """
+    Fallback simple text extraction when layout analysis fails. Stops early
+    like extract_text_with_layout, and works from the given page texts (see
+    _page_text) instead of parsing pdf_path when they are passed in.
+    """
+    if page_texts is None:
+        page_texts = map(_page_text, _iter_page_layouts(pdf_path))
+    
+    columns = _new_columns()
+    candidates = 0
+    corpus = None
     
     try:
-        for page_num, layout in enumerate(extract_pages(pdf_path), 1):
+        for page_num, page_text in enumerate(page_texts, 1):
             if page_num > 50:
                 break
-                
-            page_text = ""
-            for obj in layout:
-                if isinstance(obj, LTTextContainer):
-                    # Extract text with proper spacing
-                    text = obj.get_text()
-                    # Add space after each text container to preserve spacing
-                    page_text += text + " "
+            if page_num == 1:
+                corpus = _detect_corpus(page_text)
             
             if page_text.strip():
                 # Clean up the text and fix spacing issues
-                cleaned_text = fix_text_spacing(page_text.strip())
+                cleaned_text = fix_text_spacing(page_text.strip(), corpus)
                 
                 # Split text into sentences and phrases for better heading detection
                 # First split by common sentence endings
-                import re
-                sentences = re.split(r'[.!?]+', cleaned_text)
+                sentences = _SENTENCE_END_RE.split(cleaned_text)
                 for sentence in sentences:
                     sentence = sentence.strip()
                     if sentence and len(sentence) > 5:  # Minimum length for a meaningful heading
-                        text_elements.append({
-                            "text": sentence,
-                            "page": page_num,
-                            "x0": 0,
-                            "y0": 0,
-                            "x1": 0,
-                            "y1": 0,
-                            "font_size": 12,  # Default size
-                            "font_name": "",
-                            "is_bold": False,
-                            "is_italic": False,
-                            "position": "middle"
-                        })
+                        # No layout: default size 12, middle position, no style
+                        _append_element(columns, sentence, page_num,
+                                        0, 0, 0, 0, 12, 0)
+                        candidates += _is_candidate(sentence)
+            
+            if _budget_spent(deadline, candidates, max_candidates):
+                break
     except Exception as e:
         print(f"Error in simple text extraction: {e}")
     
-    return text_elements
+    return _finish_columns(columns)
 
 
-def fix_text_spacing(text: str) -> str:
+def fix_text_spacing(text: str, corpus: Optional[str] = None) -> str:
     """
-    Fix common spacing issues in extracted PDF text.
+    Fix common spacing issues in extracted PDF text. corpus names a
+    document-specific set of fixes (see _DOMAIN_CORPORA) to apply as well.
     """
-    import re
+    apply_common_fixes, apply_additional_fixes = _FIXERS[corpus]
     
-    # Step 1: Fix common word combinations that are stuck together
-    common_fixes = {
-        # Title and common phrases
-        'Hereare': 'Here are',
-        'isabbreviatedas': 'is abbreviated as',
-        'OOPsinterviewquestionsandanswersforfresheraswellexperienced': 'OOPs interview questions and answers for fresher as well experienced',
-        'candidatestogettheirdream': 'candidates to get their dream',
-        'job': 'job',
+    # Text with normal word spacing (at least one space per ten characters)
+    # has nothing stuck together to repair; it only needs the cleanup below
+    if text.count(' ') * 10 < len(text):
+        # Step 1: Fix common word combinations that are stuck together
+        text = apply_common_fixes(text)
         
-        # Question patterns
-        'Whatis': 'What is',
-        'Whatisaclass': 'What is a class',
-        'WhatisanObject': 'What is an Object',
-        'WhatisEncapsulation': 'What is Encapsulation',
-        'WhatisPolymorphism': 'What is Polymorphism',
-        'WhatisInheritance': 'What is Inheritance',
-        'Whataremanipulators': 'What are manipulators',
-        'WhatisanInlinefunction': 'What is an Inline function',
-        'Whatisavirtualfunction': 'What is a virtual function',
-        'Whatisoperatoroverloading': 'What is operator overloading',
-        'Whatisthesuperkeyword': 'What is the super keyword',
-        'WhatisearlyandlateBinding': 'What is early and late Binding',
-        'Whatarealltheoperatorsthatcannotbeoverloaded': 'What are all the operators that cannot be overloaded',
-        'Whetherstaticmethodcanusenonstaticmembers': 'Whether static method can use non static members',
-        'Whatareabaseclass,subclass,andsuperclass': 'What are a base class, subclass, and superclass',
-        'WhichOOPSconceptisusedasareusemechanism': 'Which OOPS concept is used as a reuse mechanism',
+        # Step 2: Fix patterns with regex (more carefully)
+        # Add spaces between lowercase and uppercase letters (camelCase) - but not in the middle of words
+        text = _CAMEL_RE.sub(r'\1 \2', text)
         
-        # OOP concepts
-        'OOPSisabbreviatedas': 'OOPS is abbreviated as',
-        'OOPSis': 'OOPS is',
-        'What isa': 'What is a',
-        'representationof': 'representation of',
-        'templatethat': 'template that',
-        'objectis': 'object is',
-        'andidentity': 'and identity',
-        'restrictedto': 'restricted to',
-        'assigningbehavior': 'assigning behavior',
-        'subclassto': 'subclass to',
-        'somethingthat': 'something that',
-        'declaredin': 'declared in',
-        'classshares': 'class shares',
-        'classiscalled': 'class is called',
-        'thenitiscalled': 'then it is called',
-        'functionswhich': 'functions which',
-        'conjunctionwiththe': 'conjunction with the',
-        'insertion(<<)andextraction(>>)operatorson': 'insertion(<<) and extraction(>>) operators on',
-        'methodused': 'method used',
-        'stateof': 'state of',
-        'sameas': 'same as',
-        'constructormusthavenoreturntype': 'constructor must have no return type',
-        'methodwhich': 'method which',
-        'whenthe': 'when the',
-        'ofscope': 'of scope',
-        'namebut': 'name but',
-        'techniqueused': 'technique used',
-        'instructsto': 'instructs to',
-        'completebody': 'complete body',
-        'functionwherever': 'function wherever',
-        'usedin': 'used in',
-        'functionof': 'function of',
-        'functionalitycanbe': 'functionality can be',
-        'overriddenin': 'overridden in',
-        'implementedby': 'implemented by',
-        'calledvirtual': 'called virtual',
-        'givenduring': 'given during',
-        'ObjectOrientedProgrammingsystem': 'Object Oriented Programming system',
-        'inwhichprograms': 'in which programs',
-        'areconsideredasacollectionofobjects': 'are considered as a collection of objects',
-        'Eachobjectisnothingbutaninstance': 'Each object is nothing but an instance',
-        'ofaclass': 'of a class',
-        'WritebasicconceptsofOOPS': 'Write basic concepts of OOPS',
-        'FollowingaretheconceptsofOOPS': 'Following are the concepts of OOPS',
-        'Aclassissimplyarepresentation': 'A class is simply a representation',
-        'ofatypeofobject': 'of a type of object',
-        'Itistheblueprint/plan/template': 'It is the blueprint/plan/template',
-        'thatdescribesthedetailsofanobject': 'that describes the details of an object',
-        'Anobjectisaninstanceofaclass': 'An object is an instance of a class',
-        'Ithasitsownstate': 'It has its own state',
-        'behaviorandidentity': 'behavior and identity',
-        'Encapsulationisanattributeofanobject': 'Encapsulation is an attribute of an object',
-        'anditcontainsalldatawhichishidden': 'and it contains all data which is hidden',
-        'Thathiddendatacanberestricted': 'That hidden data can be restricted',
-        'tothemembersofthatclass': 'to the members of that class',
-        'LevelsarePublic': 'Levels are Public',
-        'Protected,Private': 'Protected, Private',
-        'InternalandProtectedInternal': 'Internal and Protected Internal',
-        'Polymorphismisnothingbutassigning': 'Polymorphism is nothing but assigning',
-        'behaviororvalueinasubclass': 'behavior or value in a subclass',
-        'tosomethingthatwasalreadydeclared': 'to something that was already declared',
-        'inthemainclass': 'in the main class',
-        'Simply,polymorphism': 'Simply, polymorphism',
-        'takesmorethanoneform': 'takes more than one form',
-        'Inheritanceisaconceptwhereoneclass': 'Inheritance is a concept where one class',
-        'sharesthestructureandbehavior': 'shares the structure and behavior',
-        'definedinanotherclass': 'defined in another class',
-        'IfInheritanceappliedtooneclass': 'If Inheritance applied to one class',
-        'iscalledSingleInheritance': 'is called Single Inheritance',
-        'andifitdependsonmultipleclasses': 'and if it depends on multiple classes',
-        'thenitiscalledmultipleInheritance': 'then it is called multiple Inheritance',
-        'Manipulatorsarethefunctions': 'Manipulators are the functions',
-        'whichcanbeusedinconjunction': 'which can be used in conjunction',
-        'withtheinsertion': 'with the insertion',
-        'andextractionoperators': 'and extraction operators',
-        'onanobject': 'on an object',
-        'Examplesareendl': 'Examples are endl',
-        'andsetw': 'and setw',
-        'Explainthetermconstructor': 'Explain the term constructor',
-        'Aconstructorisamethod': 'A constructor is a method',
-        'usedtoinitializethestate': 'used to initialize the state',
-        'ofanobject': 'of an object',
-        'anditgetsinvoked': 'and it gets invoked',
-        'atthetimeofobjectcreation': 'at the time of object creation',
-        'Rulesforconstructorare': 'Rules for constructor are',
-        'ConstructorNameshouldbethesame': 'Constructor Name should be the same',
-        'asaclassname': 'as a class name',
-        'Adestructorisamethod': 'A destructor is a method',
-        'whichisautomaticallycalled': 'which is automatically called',
-        'whentheobjectismadeofscope': 'when the object is made of scope',
-        'ordestroyed': 'or destroyed',
-        'Destructornameisalsosameasclassname': 'Destructor name is also same as class name',
-        'butwiththetildesymbolbeforethename': 'but with the tilde symbol before the name',
-        'Aninlinefunctionisatechnique': 'An inline function is a technique',
-        'usedbythecompilersandinstructs': 'used by the compilers and instructs',
-        'toinsertcompletebodyofthefunction': 'to insert complete body of the function',
-        'whereverthatfunctionisused': 'wherever that function is used',
-        'intheprogramsourcecode': 'in the program source code',
-        'Avirtualfunctionisamemberfunction': 'A virtual function is a member function',
-        'ofaclass': 'of a class',
-        'anditsfunctionalitycanbeoverridden': 'and its functionality can be overridden',
-        'initsderivedclass': 'in its derived class',
-        'Thisfunctioncanbeimplemented': 'This function can be implemented',
-        'byusingakeywordcalledvirtual': 'by using a keyword called virtual',
-        'anditcanbegivenduringfunctiondeclaration': 'and it can be given during function declaration',
-        'Operatoroverloadingisafunction': 'Operator overloading is a function',
-        'wheredifferentoperatorsareapplied': 'where different operators are applied',
-        'anddefineddifferently': 'and defined differently',
-        'Thesuperkeywordisusedtoinvoke': 'The super keyword is used to invoke',
-        'theoverriddenmethod': 'the overridden method',
-        'whichoverridesoneofitssuperclassmethods': 'which overrides one of its superclass methods',
-        'Earlybindingreferstotheassignment': 'Early binding refers to the assignment',
-        'ofvaluestovariablesduringdesigntime': 'of values to variables during design time',
-        'Latebindingreferstotheassignment': 'Late binding refers to the assignment',
-        'ofvaluestovariablesatruntime': 'of values to variables at runtime',
-        'Virtualvoidfunction': 'Virtual void function',
-        'Purevirtual': 'Pure virtual',
-        'Followingaretheoperatorsthatcannotbeoverloaded': 'Following are the operators that cannot be overloaded',
-        'False': 'False',
-        'Whatareabaseclass': 'What are a base class',
-        'subclass,andsuperclass': 'subclass, and superclass',
-        'Thebaseclassistheparentclass': 'The base class is the parent class',
-        'Thesubclassisthechildclass': 'The subclass is the child class',
-        'Thesuperclassistheparentclass': 'The superclass is the parent class',
-        'InheritanceistheOOPSconcept': 'Inheritance is the OOPS concept',
-        'thatcanbeusedasareusemechanism': 'that can be used as a reuse mechanism',
-    }
-    
-    # Apply all the common fixes
-    for old, new in common_fixes.items():
-        text = text.replace(old, new)
-    
-    # Step 2: Fix patterns with regex (more carefully)
-    # Add spaces between lowercase and uppercase letters (camelCase) - but not in the middle of words
-    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-    
-    # Add spaces between letters and numbers
-    text = re.sub(r'([a-zA-Z])(\d)', r'\1 \2', text)
-    text = re.sub(r'(\d)([a-zA-Z])', r'\1 \2', text)
-    
-    # Step 3: Apply additional specific fixes
-    additional_fixes = {
-        # Fix common patterns that might have been missed
-        'Questi on s': 'Questions',
-        'c and id at es': 'candidates',
-        'dre a m': 'dream',
-        'Wh a t': 'What',
-        'abbrevi at ed': 'abbreviated',
-        'Progr a mm in g': 'Programming',
-        'progr a ms': 'programs',
-        'c on sidered': 'considered',
-        'E a ch': 'Each',
-        'noth in g': 'nothing',
-        'inst an ce': 'instance',
-        'cl as s': 'class',
-        'b as ic': 'basic',
-        'c on cepts': 'concepts',
-        'Follow in g': 'Following',
-        'Abstr a ction': 'Abstraction',
-        'Enc a psul at ion': 'Encapsulation',
-        'Inherit an ce': 'Inheritance',
-        'Polymorphism': 'Polymorphism',
-        'aclass': 'a class',
-        'issimply': 'is simply',
-        'arepresentation': 'a representation',
-        'ofatype': 'of a type',
-        'Itisthe': 'It is the',
-        'blueprint/plan/template': 'blueprint/plan/template',
-        'thatdescribes': 'that describes',
-        'thedetailsofanobject': 'the details of an object',
-        'Anobject': 'An object',
-        'isaninstance': 'is an instance',
-        'Ithasitsownstate': 'It has its own state',
-        'behaviorandidentity': 'behavior and identity',
-        'isanattribute': 'is an attribute',
-        'anditcontains': 'and it contains',
-        'alldatawhichishidden': 'all data which is hidden',
-        'Thathidden': 'That hidden',
-        'datacanberestricted': 'data can be restricted',
-        'tothemembers': 'to the members',
-        'ofthatclass': 'of that class',
-        'Levelsare': 'Levels are',
-        'Public,Protected': 'Public, Protected',
-        'Private,Internal': 'Private, Internal',
-        'andProtectedInternal': 'and Protected Internal',
-        'isnothingbutassigning': 'is nothing but assigning',
-        'behaviororvalue': 'behavior or value',
-        'inasubclass': 'in a subclass',
-        'tosomething': 'to something',
-        'thatwasalreadydeclared': 'that was already declared',
-        'inthemainclass': 'in the main class',
-        'takesmorethanoneform': 'takes more than one form',
-        'isaconcept': 'is a concept',
-        'whereoneclass': 'where one class',
-        'sharesthestructure': 'shares the structure',
-        'andbehavior': 'and behavior',
-        'definedinanotherclass': 'defined in another class',
-        'appliedtooneclass': 'applied to one class',
-        'iscalledSingle': 'is called Single',
-        'andifitdepends': 'and if it depends',
-        'onmultipleclasses': 'on multiple classes',
-        'thenitiscalled': 'then it is called',
-        'multipleInheritance': 'multiple Inheritance',
-        'arethefunctions': 'are the functions',
-        'whichcanbeused': 'which can be used',
-        'inconjunction': 'in conjunction',
-        'withtheinsertion': 'with the insertion',
-        'andextractionoperators': 'and extraction operators',
-        'onanobject': 'on an object',
-        'Examplesare': 'Examples are',
-        'endland': 'endl and',
-        'setw': 'setw',
-        'Explaintheterm': 'Explain the term',
-        'Aconstructor': 'A constructor',
-        'isamethod': 'is a method',
-        'usedtoinitialize': 'used to initialize',
-        'thestate': 'the state',
-        'anditgets': 'and it gets',
-        'invokedat': 'invoked at',
-        'thetimeof': 'the time of',
-        'objectcreation': 'object creation',
-        'Rulesfor': 'Rules for',
-        'constructorare': 'constructor are',
-        'Nameshouldbe': 'Name should be',
-        'thesameas': 'the same as',
-        'aclassname': 'a class name',
-        'Adestructor': 'A destructor',
-        'whichisautomatically': 'which is automatically',
-        'calledwhen': 'called when',
-        'theobjectismade': 'the object is made',
-        'ofscope': 'of scope',
-        'ordestroyed': 'or destroyed',
-        'Destructorname': 'Destructor name',
-        'isalsosame': 'is also same',
-        'asclassname': 'as class name',
-        'butwiththe': 'but with the',
-        'tildesymbol': 'tilde symbol',
-        'beforethename': 'before the name',
-        'Aninline': 'An inline',
-        'functionisatechnique': 'function is a technique',
-        'usedbythe': 'used by the',
-        'compilersand': 'compilers and',
-        'instructsto': 'instructs to',
-        'insertcomplete': 'insert complete',
-        'bodyofthe': 'body of the',
-        'functionwherever': 'function wherever',
-        'thatfunctionisused': 'that function is used',
-        'intheprogram': 'in the program',
-        'sourcecode': 'source code',
-        'Avirtual': 'A virtual',
-        'functionisamember': 'function is a member',
-        'anditsfunctionality': 'and its functionality',
-        'canbeoverridden': 'can be overridden',
-        'initsderived': 'in its derived',
-        'Thisfunction': 'This function',
-        'canbeimplemented': 'can be implemented',
-        'byusinga': 'by using a',
-        'keywordcalled': 'keyword called',
-        'anditcanbe': 'and it can be',
-        'givenduring': 'given during',
-        'functiondeclaration': 'function declaration',
-        'Operatoroverloading': 'Operator overloading',
-        'isafunction': 'is a function',
-        'wheredifferent': 'where different',
-        'operatorsare': 'operators are',
-        'appliedand': 'applied and',
-        'defineddifferently': 'defined differently',
-        'Thesuper': 'The super',
-        'keywordisused': 'keyword is used',
-        'toinvoke': 'to invoke',
-        'theoverridden': 'the overridden',
-        'whichoverrides': 'which overrides',
-        'oneofits': 'one of its',
-        'superclassmethods': 'superclass methods',
-        'Earlybinding': 'Early binding',
-        'referstothe': 'refers to the',
-        'assignmentof': 'assignment of',
-        'valuestovariables': 'values to variables',
-        'duringdesigntime': 'during design time',
-        'Latebinding': 'Late binding',
-        'atruntime': 'at runtime',
-        'Virtualvoid': 'Virtual void',
-        'Purevirtual': 'Pure virtual',
-        'Followingare': 'Following are',
-        'theoperatorsthat': 'the operators that',
-        'cannotbeoverloaded': 'cannot be overloaded',
-        'Whatare': 'What are',
-        'abaseclass': 'a base class',
-        'subclass,and': 'subclass, and',
-        'superclass': 'superclass',
-        'Thebase': 'The base',
-        'classisthe': 'class is the',
-        'parentclass': 'parent class',
-        'Thesubclass': 'The subclass',
-        'isthechild': 'is the child',
-        'Thesuperclass': 'The superclass',
-        'Inheritanceisthe': 'Inheritance is the',
-        'OOPSconcept': 'OOPS concept',
-        'thatcanbe': 'that can be',
-        'usedas': 'used as',
-        'areusemechanism': 'a reuse mechanism',
-    }
-    
-    # Apply additional fixes
-    for old, new in additional_fixes.items():
-        text = text.replace(old, new)
+        # Add spaces between letters and numbers
+        text = _ALPHA_DIGIT_RE.sub(r'\1 \2', text)
+        text = _DIGIT_ALPHA_RE.sub(r'\1 \2', text)
+        
+        # Step 3: Apply additional specific fixes
+        text = apply_additional_fixes(text)
     
     # Step 3: Clean up multiple spaces and punctuation
-    text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single space
-    text = re.sub(r'\s+([.,!?])', r'\1', text)  # Remove spaces before punctuation
-    text = re.sub(r'([.,!?])([A-Za-z])', r'\1 \2', text)  # Add space after punctuation if followed by letter
+    text = _MULTISPACE_RE.sub(' ', text)  # Multiple spaces to single space
+    text = _SPACE_PUNCT_RE.sub(r'\1', text)  # Remove spaces before punctuation
+    text = _PUNCT_SPACE_RE.sub(r'\1 \2', text)  # Add space after punctuation if followed by letter
     
     # Step 4: Final cleanup
     text = text.strip()
@@ -515,30 +926,43 @@ def fix_text_spacing(text: str) -> str:
     return text
 
 
-def extract_font_info(text_container: LTTextContainer) -> Dict[str, Any]:
+def extract_font_info(text_container: LTTextContainer, accurate: bool = False) -> Dict[str, Any]:
     """
     Extract font information from text container.
     
     Args:
         text_container: PDF text container object
+        accurate: Scan every character for the largest size and all fonts
+            used; by default only the first text line is read, which is
+            enough for body text that only counts towards the font
+            statistics
         
     Returns:
         Dictionary with font properties
     """
     font_size = 0
     font_name = ""
+    font_names = set()
+    
+    if accurate:
+        chars = _iter_chars(text_container)
+    else:
+        first_line = next(iter(text_container), None)
+        chars = _iter_chars(first_line if isinstance(first_line, LTTextContainer)
+                            else text_container)
+    
+    for obj in chars:
+        font_size = max(font_size, obj.size)
+        font_name = obj.fontname if hasattr(obj, 'fontname') else ""
+        font_names.add(font_name)
+    
+    # Check for bold/italic indicators in the font names used
     is_bold = False
     is_italic = False
-    
-    for obj in text_container:
-        if isinstance(obj, LTChar):
-            font_size = max(font_size, obj.size)
-            font_name = obj.fontname if hasattr(obj, 'fontname') else ""
-            
-            # Check for bold/italic indicators in font name
-            font_lower = font_name.lower()
-            is_bold = is_bold or any(word in font_lower for word in ['bold', 'black', 'heavy'])
-            is_italic = is_italic or any(word in font_lower for word in ['italic', 'oblique'])
+    for name in font_names:
+        name_bold, name_italic = _font_flags(name)
+        is_bold = is_bold or name_bold
+        is_italic = is_italic or name_italic
     
     return {
         "size": font_size,
@@ -548,6 +972,27 @@ def extract_font_info(text_container: LTTextContainer) -> Dict[str, Any]:
     }
 
 
+def _iter_chars(text_container: LTTextContainer) -> Iterator[LTChar]:
+    """
+    Characters of a text container; text boxes hold text lines, which hold
+    the characters.
+    """
+    for line in text_container:
+        for obj in (line if isinstance(line, LTTextContainer) else (line,)):
+            if isinstance(obj, LTChar):
+                yield obj
+
+
+@functools.lru_cache(maxsize=256)
+def _font_flags(font_name: str) -> Tuple[bool, bool]:
+    """
+    Bold/italic flags implied by a font name. Cached: a document uses only
+    a handful of fonts, so each name is inspected once.
+    """
+    return (_BOLD_FONT_RE.search(font_name) is not None,
+            _ITALIC_FONT_RE.search(font_name) is not None)
+
+
 def calculate_position(text_container: LTTextContainer, layout) -> str:
     """
     Calculate relative position of text on page.
@@ -577,57 +1022,68 @@ def calculate_position(text_container: LTTextContainer, layout) -> str:
             return "middle"
         else:
             return "bottom"
-    except:
+    except Exception:
         # Default to middle if there's any error
         return "middle"
 
 
-def analyze_headings(text_elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def analyze_headings(text_elements: TextElements) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
     """
     Analyze text elements and classify them as headings based on heuristics.
     
     Args:
-        text_elements: List of text elements with layout information
+        text_elements: Column arrays of text elements with layout information
         
     Returns:
-        List of classified headings
+        List of classified headings, and the first heading of each level
     """
     headings = []
+    first_by_level = {}
+    
+    texts = text_elements["text"]
+    sizes = text_elements["font_size"]
+    flags = text_elements["flags"]
+    pages = text_elements["page"]
     
     # Calculate font size statistics for normalization
-    font_sizes = [elem["font_size"] for elem in text_elements if elem["font_size"] > 0]
-    if not font_sizes:
-        return headings
-    
-    max_font_size = max(font_sizes)
-    avg_font_size = sum(font_sizes) / len(font_sizes)
-    
-    for elem in text_elements:
-        text = elem["text"]
-        font_size = elem["font_size"]
-        is_bold = elem["is_bold"]
-        position = elem["position"]
-        
-        # Skip very short or very long text
-        if len(text) < 2 or len(text) > 200:
-            continue
-        
-        # Heading classification heuristics
-        level = classify_heading_level(text, font_size, is_bold, position, max_font_size, avg_font_size)
-        
-        if level:
-            headings.append({
-                "level": level,
-                "text": text,
-                "page": elem["page"],
-                "font_size": font_size,
-                "position": position
-            })
+    font_sizes = sizes[sizes > 0]
+    if not font_sizes.size:
+        return headings, first_by_level
     
-    # Sort headings by page and position
-    headings.sort(key=lambda x: (x["page"], -x["font_size"], x["position"] == "top"))
+    max_font_size = float(font_sizes.max())
+    avg_font_size = float(font_sizes.mean())
+    
+    # Skip very short or very long text
+    text_lens = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    candidates = np.flatnonzero((text_lens >= 2) & (text_lens <= 200))
+    
+    # Heading classification heuristics, over all candidates at once
+    levels = _classify_levels(texts[candidates],
+                              sizes[candidates] / max_font_size,
+                              (flags[candidates] & _FLAG_BOLD) != 0,
+                              (flags[candidates] & _FLAG_TOP) != 0,
+                              avg_font_size / max_font_size)
+    
+    hits = levels > 0
+    indices = candidates[hits]
+    levels = levels[hits]
+    
+    # Sort headings by page and position: larger fonts first within a page,
+    # then elements away from the top before those at the top
+    order = np.lexsort(((flags[indices] & _FLAG_TOP) != 0, -sizes[indices], pages[indices]))
+    
+    for i, level in zip(indices[order], levels[order]):
+        heading = {
+            "level": _LEVEL_NAMES[level],
+            "text": texts[i],
+            "page": int(pages[i]),
+            "font_size": float(sizes[i]),
+            "position": _position_name(flags[i])
+        }
+        headings.append(heading)
+        first_by_level.setdefault(heading["level"], heading)
     
-    return headings
+    return headings, first_by_level
 
 
 def classify_heading_level(text: str, font_size: float, is_bold: bool, 
@@ -648,57 +1104,124 @@ def classify_heading_level(text: str, font_size: float, is_bold: bool,
     """
     # Normalize font size
     font_ratio = font_size / max_font_size if max_font_size > 0 else 0
+    avg_ratio = avg_font_size / max_font_size if max_font_size > 0 else 0
     
-    # H1: Large font, bold, top position, or specific patterns
-    if (font_ratio > 0.8 or 
-        (font_ratio > 0.6 and is_bold and position == "top") or
-        text.startswith(('Chapter', 'Section', 'Part', 'Introduction', 'Conclusion')) or
-        (len(text) < 50 and text.isupper())):
-        return "H1"
-    
-    # H2: Medium-large font, numbered patterns, or bold text
-    elif (font_ratio > 0.5 or 
-          (font_ratio > 0.4 and is_bold) or
-          text.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')) or
-          (len(text) < 80 and any(char.isdigit() for char in text[:3]))):
-        return "H2"
-    
-    # H3: Medium font, descriptive text, or specific patterns
-    elif (font_ratio > 0.3 or 
-          (font_ratio > 0.25 and is_bold) or
-          text.startswith(('•', '●', '-', '○')) or
-          (len(text) < 120 and font_ratio > avg_font_size / max_font_size)):
-        return "H3"
+    level = _classify_levels(np.array([text], dtype=object),
+                             np.array([font_ratio]),
+                             np.array([is_bold]),
+                             np.array([position == "top"]),
+                             avg_ratio)[0]
+    return _LEVEL_NAMES[level]
+
+
+_LEVEL_NAMES = (None, "H1", "H2", "H3")
+
+_H1_PREFIXES = ('Chapter', 'Section', 'Part', 'Introduction', 'Conclusion')
+_H2_PREFIXES = ('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')
+_H3_PREFIXES = ('•', '●', '-', '○')
+
+
+def _classify_levels(texts: np.ndarray, font_ratios: np.ndarray, is_bold: np.ndarray,
+                     is_top: np.ndarray, avg_ratio: float) -> np.ndarray:
+    """
+    Heading level codes for arrays of elements: 1-3 for H1-H3 (index into
+    _LEVEL_NAMES), 0 for body text. Font ratios are relative to the largest
+    font in the document, avg_ratio is the average font size on that scale.
+    """
+    text_lens = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    levels = _classify_numeric(font_ratios, is_bold, is_top, text_lens, avg_ratio)
     
-    return None
+    # The text patterns can only raise an element to a higher level, so each
+    # tier's pattern is only checked where the numeric rules gave less
+    for code, matches in _TEXT_RULES:
+        pending = np.flatnonzero((levels == 0) | (levels > code))
+        if pending.size:
+            hit = np.fromiter(map(matches, texts[pending]), dtype=bool, count=pending.size)
+            levels[pending[hit]] = code
+    
+    return levels
+
+
+def _classify_numeric(font_ratios: np.ndarray, is_bold: np.ndarray, is_top: np.ndarray,
+                      text_lens: np.ndarray, avg_ratio: float) -> np.ndarray:
+    """
+    Level codes (as in _classify_levels) from the font size and style rules
+    alone, without the text patterns.
+    """
+    # H1: Large font, or bold at the top of the page
+    h1 = (font_ratios > 0.8) | ((font_ratios > 0.6) & is_bold & is_top)
+    
+    # H2: Medium-large font, or bold text
+    h2 = (font_ratios > 0.5) | ((font_ratios > 0.4) & is_bold)
+    
+    # H3: Medium font, or short text above the average size
+    h3 = ((font_ratios > 0.3) |
+          ((font_ratios > 0.25) & is_bold) |
+          ((text_lens < 120) & (font_ratios > avg_ratio)))
+    
+    return np.select([h1, h2, h3], [1, 2, 3], default=0).astype(np.int8)
+
+
+def _is_h1_text(text: str) -> bool:
+    """
+    Chapter/section style openings, or short all-caps text.
+    """
+    return text.startswith(_H1_PREFIXES) or (len(text) < 50 and text.isupper())
+
+
+def _is_h2_text(text: str) -> bool:
+    """
+    Numbered patterns, or short text starting with a digit.
+    """
+    return (text.startswith(_H2_PREFIXES) or
+            (len(text) < 80 and any(char.isdigit() for char in text[:3])))
 
 
-def extract_title(headings: List[Dict[str, Any]], text_elements: List[Dict[str, Any]]) -> str:
+def _is_h3_text(text: str) -> bool:
+    """
+    Bullet points.
+    """
+    return text.startswith(_H3_PREFIXES)
+
+
+_TEXT_RULES: Tuple[Tuple[int, Callable[[str], bool]], ...] = (
+    (1, _is_h1_text),
+    (2, _is_h2_text),
+    (3, _is_h3_text),
+)
+
+
+def extract_title(first_by_level: Dict[str, Dict[str, Any]], text_elements: TextElements) -> str:
     """
     Extract document title from headings or first significant text.
     
     Args:
-        headings: List of classified headings
-        text_elements: List of all text elements
+        first_by_level: First classified heading of each level
+        text_elements: Column arrays of all text elements
         
     Returns:
         Document title
     """
-    # Try to find first H1 heading
-    for heading in headings:
-        if heading["level"] == "H1":
-            return heading["text"]
-    
-    # Try to find first H2 heading
-    for heading in headings:
-        if heading["level"] == "H2":
-            return heading["text"]
+    # Try the first H1 heading, then the first H2 heading
+    for level in ("H1", "H2"):
+        if level in first_by_level:
+            return first_by_level[level]["text"]
     
     # Fallback to first significant text element
-    for elem in text_elements:
-        text = elem["text"]
+    return _first_top_text(text_elements) or "Untitled Document"
+
+
+def _first_top_text(text_elements: TextElements) -> Optional[str]:
+    """
+    First text element of title length near the top of its page, if any.
+    """
+    texts = text_elements["text"]
+    flags = text_elements["flags"]
+    sizes = text_elements["font_size"]
+    for i in range(len(texts)):
+        text = texts[i]
         if (len(text) > 3 and len(text) < 100 and 
-            elem["position"] == "top" and elem["font_size"] > 0):
+            flags[i] & _FLAG_TOP and sizes[i] > 0):
             return text
     
-    return "Untitled Document" 
+    return None